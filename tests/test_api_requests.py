@@ -1,31 +1,37 @@
-import asyncio
 import inspect
 from asyncio import iscoroutine
 from collections import defaultdict
-from copy import copy
+from copy import deepcopy
 from functools import partial
 from http.cookiejar import Cookie
 from inspect import isclass
-from typing import Any, Dict, Type, cast
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Tuple, Type
 from unittest import mock
 
 import pytest
 from _pytest.logging import LogCaptureFixture  # NOQA
 from pytest_twisted import ensureDeferred
 from scrapy import Request, Spider, signals
+from scrapy.crawler import Crawler
 from scrapy.downloadermiddlewares.cookies import CookiesMiddleware
 from scrapy.downloadermiddlewares.httpcompression import ACCEPTED_ENCODINGS
 from scrapy.exceptions import CloseSpider
 from scrapy.http import Response, TextResponse
 from scrapy.http.cookies import CookieJar
+from scrapy.settings.default_settings import (
+    CONCURRENT_REQUESTS as DEFAULT_CONCURRENT_REQUESTS,
+)
+from scrapy.settings.default_settings import (
+    CONCURRENT_REQUESTS_PER_DOMAIN as DEFAULT_CONCURRENT_REQUESTS_PER_DOMAIN,
+)
 from scrapy.settings.default_settings import DEFAULT_REQUEST_HEADERS
 from scrapy.settings.default_settings import USER_AGENT as DEFAULT_USER_AGENT
-from twisted.internet.defer import Deferred
+from twisted.internet.defer import Deferred, DeferredList
 from zyte_api.aio.errors import RequestError
 
 from scrapy_zyte_api._cookies import _get_cookie_jar
 from scrapy_zyte_api._params import _EXTRACT_KEYS, ANY_VALUE
-from scrapy_zyte_api.handler import _ParamParser
 from scrapy_zyte_api.responses import _process_response
 
 from . import (
@@ -35,6 +41,7 @@ from . import (
     get_crawler,
     get_download_handler,
     get_downloader_middleware,
+    make_handler,
     set_env,
 )
 from .mockserver import DelayedResource, MockServer, produce_request_response
@@ -43,6 +50,8 @@ from .mockserver import DelayedResource, MockServer, produce_request_response
 EXTRACT_KEYS_ITER = iter(_EXTRACT_KEYS)
 EXTRACT_KEY = next(EXTRACT_KEYS_ITER)
 EXTRACT_KEY_2 = next(EXTRACT_KEYS_ITER)
+EXTRACT_KEY_OPTIONS = f"{EXTRACT_KEY}Options"
+EXTRACT_KEY_2_OPTIONS = f"{EXTRACT_KEY_2}Options"
 
 DEFAULT_ACCEPT_ENCODING = ", ".join(
     encoding.decode() for encoding in ACCEPTED_ENCODINGS
@@ -50,7 +59,7 @@ DEFAULT_ACCEPT_ENCODING = ", ".join(
 
 
 def sort_dict_list(dict_list):
-    return sorted(dict_list, key=lambda i: sorted(i.items()))
+    return sorted(dict_list, key=lambda i: tuple(sorted(i.items())))
 
 
 @pytest.mark.parametrize(
@@ -147,11 +156,11 @@ UNSET = object()
         (False, False),
     ],
 )
-async def test_enabled(setting, enabled, mockserver):
+async def test_enabled(setting, enabled):
     settings = {}
     if setting is not UNSET:
         settings["ZYTE_API_ENABLED"] = setting
-    async with mockserver.make_handler(settings) as handler:
+    async with make_handler(settings) as handler:
         if enabled:
             assert handler is not None
         else:
@@ -177,19 +186,27 @@ async def test_coro_handling(zyte_api: bool, mockserver):
         await dfd
 
 
+@ensureDeferred
+async def test_exception_serialization(caplog: LogCaptureFixture):
+    """Parameters that cannot be serialized into JSON cause an error before
+    the request is sent, so no Zyte API server is needed."""
+    caplog.set_level("DEBUG")
+    meta = {"zyte_api": {"echoData": Request("http://test.com")}}
+    async with make_handler({}) as handler:
+        req = Request("http://example.com", method="POST", meta=meta)
+        with pytest.raises(TypeError):
+            await handler.download_request(req, None)
+    assert (
+        "Got an error when processing Zyte API request "
+        "(http://example.com): Object of type Request is not JSON "
+        "serializable"
+    ) in caplog.text
+
+
 @ensureDeferred
 @pytest.mark.parametrize(
     "meta, exception_type, exception_text",
     [
-        (
-            {"zyte_api": {"echoData": Request("http://test.com")}},
-            TypeError,
-            (
-                "Got an error when processing Zyte API request "
-                "(http://example.com): Object of type Request is not JSON "
-                "serializable"
-            ),
-        ),
         (
             {"zyte_api": {"browserHtml": True, "httpResponseBody": True}},
             RequestError,
@@ -217,42 +234,70 @@ async def test_exceptions(
         assert exception_text in caplog.text
 
 
+# Higher than the default concurrency of both Scrapy and the Zyte API client,
+# so that reaching it requires the CONCURRENT_REQUESTS* settings to be used.
+HIGHER_CONCURRENCY = (
+    max(
+        DEFAULT_CLIENT_CONCURRENCY,
+        DEFAULT_CONCURRENT_REQUESTS,
+        DEFAULT_CONCURRENT_REQUESTS_PER_DOMAIN,
+    )
+    + 1
+)
+
+
+def _delayed_requests(count):
+    """Return *count* requests for a DelayedResource mock server, all slow
+    except for the last one, which can only get the first response if all
+    requests are sent concurrently."""
+    return [
+        Request(
+            "https://example.com",
+            meta={
+                "index": index,
+                "zyte_api": {
+                    "browserHtml": True,
+                    "delay": 0.001 if index == count - 1 else 0.2,
+                },
+            },
+            dont_filter=True,
+        )
+        for index in range(count)
+    ]
+
+
 @ensureDeferred
 async def test_higher_concurrency():
-    """Make sure that CONCURRENT_REQUESTS and CONCURRENT_REQUESTS_PER_DOMAIN
-    have an effect on Zyte API requests."""
-    # Send DEFAULT_CLIENT_CONCURRENCY + 1 requests, the last one taking less
-    # time than the rest, and ensure that the first response comes from the
-    # last request, verifying that a concurrency ≥ DEFAULT_CLIENT_CONCURRENCY
-    # + 1 has been reached.
-    concurrency = DEFAULT_CLIENT_CONCURRENCY + 1
+    """Make sure that CONCURRENT_REQUESTS has an effect on the concurrency of
+    Zyte API requests."""
     response_indexes = []
-    expected_first_index = concurrency - 1
-    fast_seconds = 0.001
-    slow_seconds = 0.2
+    settings = {"CONCURRENT_REQUESTS": HIGHER_CONCURRENCY}
+    with MockServer(DelayedResource) as server:
+        async with server.make_handler(settings) as handler:
+            deferreds = []
+            for index, request in enumerate(_delayed_requests(HIGHER_CONCURRENCY)):
+                deferred = handler.download_request(request, None)
+                deferred.addCallback(
+                    lambda _, index=index: response_indexes.append(index)
+                )
+                deferreds.append(deferred)
+            await DeferredList(deferreds, fireOnOneErrback=True)
+
+    assert response_indexes[0] == HIGHER_CONCURRENCY - 1
+
 
+@ensureDeferred
+async def test_higher_concurrency_crawl():
+    """Make sure that CONCURRENT_REQUESTS and CONCURRENT_REQUESTS_PER_DOMAIN
+    have an effect on Zyte API requests sent during a crawl."""
+    response_indexes = []
     with MockServer(DelayedResource) as server:
 
         class TestSpider(Spider):
             name = "test_spider"
 
             def start_requests(self):
-                for index in range(concurrency):
-                    yield Request(
-                        "https://example.com",
-                        meta={
-                            "index": index,
-                            "zyte_api": {
-                                "browserHtml": True,
-                                "delay": (
-                                    fast_seconds
-                                    if index == expected_first_index
-                                    else slow_seconds
-                                ),
-                            },
-                        },
-                        dont_filter=True,
-                    )
+                yield from _delayed_requests(HIGHER_CONCURRENCY)
 
             async def parse(self, response):
                 response_indexes.append(response.meta["index"])
@@ -260,8 +305,8 @@ async def test_higher_concurrency():
 
         crawler = await get_crawler(
             {
-                "CONCURRENT_REQUESTS": concurrency,
-                "CONCURRENT_REQUESTS_PER_DOMAIN": concurrency,
+                "CONCURRENT_REQUESTS": HIGHER_CONCURRENCY,
+                "CONCURRENT_REQUESTS_PER_DOMAIN": HIGHER_CONCURRENCY,
                 "ZYTE_API_URL": server.urljoin("/"),
             },
             TestSpider,
@@ -269,7 +314,7 @@ async def test_higher_concurrency():
         )
         await crawler.crawl()
 
-    assert response_indexes[0] == expected_first_index
+    assert response_indexes[0] == HIGHER_CONCURRENCY - 1
 
 
 AUTOMAP_PARAMS: Dict[str, Any] = {}
@@ -295,8 +340,8 @@ GET_API_PARAMS_KWARGS = {
 
 
 @ensureDeferred
-async def test_params_parser_input_default(mockserver):
-    async with mockserver.make_handler() as handler:
+async def test_params_parser_input_default():
+    async with make_handler({}) as handler:
         for key in GET_API_PARAMS_KWARGS:
             actual = getattr(handler._param_parser, f"_{key}")
             expected = GET_API_PARAMS_KWARGS[key]
@@ -304,7 +349,7 @@ async def test_params_parser_input_default(mockserver):
 
 
 @ensureDeferred
-async def test_param_parser_input_custom(mockserver):
+async def test_param_parser_input_custom():
     settings = {
         "ZYTE_API_EXPERIMENTAL_COOKIES_ENABLED": True,
         "ZYTE_API_AUTOMAP_PARAMS": {"c": "d"},
@@ -314,7 +359,7 @@ async def test_param_parser_input_custom(mockserver):
         "ZYTE_API_SKIP_HEADERS": {"A"},
         "ZYTE_API_TRANSPARENT_MODE": True,
     }
-    async with mockserver.make_handler(settings) as handler:
+    async with make_handler(settings) as handler:
         parser = handler._param_parser
         assert parser._automap_params == {"c": "d"}
         assert parser._browser_headers == {b"b": "b"}
@@ -336,11 +381,11 @@ async def test_param_parser_input_custom(mockserver):
         ({"a": "b"}, True),
     ],
 )
-async def test_param_parser_output_side_effects(output, uses_zyte_api, mockserver):
+async def test_param_parser_output_side_effects(output, uses_zyte_api):
     """If _get_api_params returns None, requests go outside Zyte API, but if it
     returns a dictionary, even if empty, requests go through Zyte API."""
-    request = Request(url=mockserver.urljoin("/"))
-    async with mockserver.make_handler() as handler:
+    request = Request(url="https://example.com")
+    async with make_handler({}) as handler:
         handler._param_parser = mock.Mock()
         handler._param_parser.parse = mock.Mock(return_value=output)
         handler._download_request = mock.AsyncMock(side_effect=RuntimeError)
@@ -356,10 +401,37 @@ async def test_param_parser_output_side_effects(output, uses_zyte_api, mockserve
         handler._fallback_handler.download_request.assert_called()
 
 
-DEFAULT_AUTOMAP_PARAMS: Dict[str, Any] = {
-    "httpResponseBody": True,
-    "httpResponseHeaders": True,
-}
+# Read-only, since it is shared by the expected values of many test cases.
+DEFAULT_AUTOMAP_PARAMS: Mapping[str, Any] = MappingProxyType(
+    {
+        "httpResponseBody": True,
+        "httpResponseHeaders": True,
+    }
+)
+
+
+_CRAWLERS: Dict[str, Crawler] = {}
+
+
+async def _get_cached_crawler(settings=None):
+    """Return a crawler built with *settings*.
+
+    Crawlers are cached by settings and shared across tests, so only use this
+    in tests that do not depend on crawler state: cookies, environment
+    variables or log messages from component initialization.
+    """
+    key = repr(sorted((settings or {}).items()))
+    if key not in _CRAWLERS:
+        _CRAWLERS[key] = await get_crawler(settings)
+    return _CRAWLERS[key]
+
+
+async def _get_param_parser(settings=None):
+    """Return the parameter parser of a cached crawler built with
+    *settings*."""
+    crawler = await _get_cached_crawler(settings)
+    handler = get_download_handler(crawler, "https")
+    return handler._param_parser
 
 
 @pytest.mark.parametrize(
@@ -443,9 +515,7 @@ async def test_transparent_mode_toggling(setting, meta, expected):
     """
     request = Request(url="https://example.com", meta=meta)
     settings = {"ZYTE_API_TRANSPARENT_MODE": setting}
-    crawler = await get_crawler(settings)
-    handler = get_download_handler(crawler, "https")
-    param_parser = handler._param_parser
+    param_parser = await _get_param_parser(settings)
     func = partial(param_parser.parse, request)
     if isclass(expected):
         with pytest.raises(expected):
@@ -465,8 +535,7 @@ async def test_api_disabling_deprecated(meta):
     deprecation warning asking to replace them with False."""
     request = Request(url="https://example.com")
     request.meta["zyte_api"] = meta
-    crawler = await get_crawler()
-    param_parser = _ParamParser(crawler)
+    param_parser = await _get_param_parser()
     with pytest.warns(DeprecationWarning, match=r".* Use False instead\.$"):
         api_params = param_parser.parse(request)
     assert api_params is None
@@ -480,15 +549,14 @@ async def test_bad_meta_type(key, value):
     ``zyte_api_automap`` request metadata keys (*key*) trigger a
     :exc:`ValueError` exception."""
     request = Request(url="https://example.com", meta={key: value})
-    crawler = await get_crawler()
-    param_parser = _ParamParser(crawler)
+    param_parser = await _get_param_parser()
     with pytest.raises(ValueError):
         param_parser.parse(request)
 
 
 @pytest.mark.parametrize("meta", ["zyte_api", "zyte_api_automap"])
 @ensureDeferred
-async def test_job_id(meta, mockserver):
+async def test_job_id(meta):
     """Test how the value of the ``SHUB_JOBKEY`` environment variable is
     included as ``jobId`` among the parameters sent to Zyte API, both with
     manually-defined parameters and with automatically-mapped parameters.
@@ -507,7 +575,7 @@ async def test_job_id(meta, mockserver):
 
 
 @ensureDeferred
-async def test_default_params_none(mockserver, caplog):
+async def test_default_params_none(caplog):
     """Test how setting a value to ``None`` in the dictionary of the
     ZYTE_API_DEFAULT_PARAMS and ZYTE_API_AUTOMAP_PARAMS settings causes a
     warning, because that is not expected to be a valid value.
@@ -525,13 +593,24 @@ async def test_default_params_none(mockserver, caplog):
         "ZYTE_API_AUTOMAP_PARAMS": {"d": None, "e": "f"},
     }
     with caplog.at_level("WARNING"):
-        async with mockserver.make_handler(settings) as handler:
+        async with make_handler(settings) as handler:
             assert handler._param_parser._automap_params == {"e": "f"}
             assert handler._param_parser._default_params == {"b": "c"}
     assert "Parameter 'a' in the ZYTE_API_DEFAULT_PARAMS setting is None" in caplog.text
     assert "Parameter 'd' in the ZYTE_API_AUTOMAP_PARAMS setting is None" in caplog.text
 
 
+def _assert_log_messages(caplog, messages):
+    """Assert that every string in *messages* is part of the captured log
+    text, or that nothing was logged if *messages* is empty."""
+    if not messages:
+        assert not caplog.records
+        return
+    text = caplog.text
+    for message in messages:
+        assert message in text
+
+
 @pytest.mark.parametrize(
     "setting,meta,expected,warnings",
     [
@@ -585,9 +664,7 @@ async def test_default_params_merging(
     """
     request = Request(url="https://example.com")
     request.meta[meta_key] = meta
-    crawler = await get_crawler({setting_key: setting})
-    handler = get_download_handler(crawler, "https")
-    param_parser = handler._param_parser
+    param_parser = await _get_param_parser({setting_key: setting})
     caplog.clear()
     with caplog.at_level("WARNING"):
         api_params = param_parser.parse(request)
@@ -595,11 +672,7 @@ async def test_default_params_merging(
         api_params.pop(key)
     api_params.pop("url")
     assert api_params == expected
-    if warnings:
-        for warning in warnings:
-            assert warning in caplog.text
-    else:
-        assert not caplog.records
+    _assert_log_messages(caplog, warnings)
 
 
 @pytest.mark.parametrize(
@@ -620,6 +693,16 @@ async def test_default_params_merging(
             {"a": "b"},
             {"a": None},
         ),
+        # merge nested
+        (
+            {"a": {"b": 1}},
+            {"a": {"c": 1}},
+        ),
+        # drop nested
+        (
+            {"a": {"b": 1, "c": 1}},
+            {"a": {"b": None}},
+        ),
     ],
 )
 @pytest.mark.parametrize(
@@ -639,21 +722,59 @@ async def test_default_params_immutability(setting_key, meta_key, setting, meta)
     key does not affect the contents of the setting for later requests."""
     request = Request(url="https://example.com")
     request.meta[meta_key] = meta
-    default_params = copy(setting)
+    default_params = deepcopy(setting)
     crawler = await get_crawler({setting_key: setting})
     handler = get_download_handler(crawler, "https")
     param_parser = handler._param_parser
+    parser_params = deepcopy(
+        (param_parser._default_params, param_parser._automap_params)
+    )
     param_parser.parse(request)
     assert default_params == setting
+    assert parser_params == (
+        param_parser._default_params,
+        param_parser._automap_params,
+    )
+
+
+def _set_cookies(cookie_jar, cookies):
+    """Add *cookies*, a list of cookie dictionaries, directly to *cookie_jar*,
+    i.e. without going through the cookies downloader middleware."""
+    for cookie in cookies:
+        cookie_jar.set_cookie(
+            Cookie(
+                version=1,
+                name=cookie["name"],
+                value=cookie["value"],
+                port=None,
+                port_specified=False,
+                domain=cookie.get("domain"),
+                domain_specified="domain" in cookie,
+                domain_initial_dot=cookie.get("domain", "").startswith("."),
+                path=cookie.get("path", "/"),
+                path_specified="path" in cookie,
+                secure=cookie.get("secure", False),
+                expires=cookie.get("expires", None),
+                discard=False,
+                comment=None,
+                comment_url=None,
+                rest={},
+            )
+        )
 
 
 async def _test_automap(
     settings, request_kwargs, meta, expected, warnings, caplog, cookie_jar=None
 ):
-    request = Request(url="https://example.com", **request_kwargs)
+    # CookiesMiddleware modifies list-based Request.cookies in place, so work
+    # on a copy to keep module-level cookie constants unchanged across tests.
+    request = Request(url="https://example.com", **deepcopy(request_kwargs))
     request.meta["zyte_api_automap"] = meta
     settings = {**settings, "ZYTE_API_TRANSPARENT_MODE": True}
-    crawler = await get_crawler(settings)
+    if "cookies" in request_kwargs:
+        crawler = await get_crawler(settings)
+    else:
+        crawler = await _get_cached_crawler(settings)
     await _process_request(crawler, request, is_start_request=True)
     if "cookies" in request_kwargs:
         try:
@@ -663,26 +784,7 @@ async def _test_automap(
         else:
             if cookie_jar:
                 _cookie_jar = _get_cookie_jar(request, cookie_middleware.jars)
-                for cookie in cookie_jar:
-                    _cookie = Cookie(
-                        version=1,
-                        name=cookie["name"],
-                        value=cookie["value"],
-                        port=None,
-                        port_specified=False,
-                        domain=cookie.get("domain"),
-                        domain_specified="domain" in cookie,
-                        domain_initial_dot=cookie.get("domain", "").startswith("."),
-                        path=cookie.get("path", "/"),
-                        path_specified="path" in cookie,
-                        secure=cookie.get("secure", False),
-                        expires=cookie.get("expires", None),
-                        discard=False,
-                        comment=None,
-                        comment_url=None,
-                        rest={},
-                    )
-                    _cookie_jar.set_cookie(_cookie)
+                _set_cookies(_cookie_jar, cookie_jar)
 
     handler = get_download_handler(crawler, "https")
     param_parser = handler._param_parser
@@ -690,11 +792,7 @@ async def _test_automap(
         api_params = param_parser.parse(request)
     api_params.pop("url")
     assert api_params == expected
-    if warnings:
-        for warning in warnings:
-            assert warning in caplog.text
-    else:
-        assert not caplog.records
+    _assert_log_messages(caplog, warnings)
 
 
 @pytest.mark.parametrize(
@@ -702,12 +800,11 @@ async def _test_automap(
     [
         # If no other known main output is specified in meta, httpResponseBody
         # is requested.
-        ({}, {"httpResponseBody": True, "httpResponseHeaders": True}, []),
+        ({}, DEFAULT_AUTOMAP_PARAMS, []),
         (
             {"unknownMainOutput": True},
             {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
+                **DEFAULT_AUTOMAP_PARAMS,
                 "unknownMainOutput": True,
             },
             [],
@@ -717,7 +814,7 @@ async def _test_automap(
         # may stop working for binary responses in the future.
         (
             {"httpResponseBody": True},
-            {"httpResponseBody": True, "httpResponseHeaders": True},
+            DEFAULT_AUTOMAP_PARAMS,
             [],
         ),
         # If other main outputs are specified in meta, httpRequestBody is not
@@ -770,7 +867,7 @@ async def _test_automap(
         # httpResponseBody.
         (
             {"httpResponseHeaders": True},
-            {"httpResponseBody": True, "httpResponseHeaders": True},
+            DEFAULT_AUTOMAP_PARAMS,
             [],
         ),
         (
@@ -830,12 +927,12 @@ async def test_automap_main_outputs(meta, expected, warnings, caplog):
         # stops being set to True by default in those scenarios.
         (
             {"httpResponseHeaders": True},
-            {"httpResponseBody": True, "httpResponseHeaders": True},
+            DEFAULT_AUTOMAP_PARAMS,
             [],
         ),
         (
             {"httpResponseBody": True, "httpResponseHeaders": True},
-            {"httpResponseBody": True, "httpResponseHeaders": True},
+            DEFAULT_AUTOMAP_PARAMS,
             [],
         ),
         (
@@ -930,10 +1027,7 @@ async def test_automap_header_output(meta, expected, warnings, caplog):
         (
             "GET",
             {},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
+            DEFAULT_AUTOMAP_PARAMS,
             [],
         ),
         # Other HTTP methods, regardless of whether they are supported,
@@ -944,8 +1038,7 @@ async def test_automap_header_output(meta, expected, warnings, caplog):
                 method,
                 {},
                 {
-                    "httpResponseBody": True,
-                    "httpResponseHeaders": True,
+                    **DEFAULT_AUTOMAP_PARAMS,
                     "httpRequestMethod": method,
                 },
                 [],
@@ -968,18 +1061,14 @@ async def test_automap_header_output(meta, expected, warnings, caplog):
         (
             None,
             {"httpRequestMethod": "GET"},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
+            DEFAULT_AUTOMAP_PARAMS,
             ["Use Request.method"],
         ),
         (
             "POST",
             {"httpRequestMethod": "POST"},
             {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
+                **DEFAULT_AUTOMAP_PARAMS,
                 "httpRequestMethod": "POST",
             },
             ["Use Request.method"],
@@ -990,10 +1079,7 @@ async def test_automap_header_output(meta, expected, warnings, caplog):
         (
             "POST",
             {"httpRequestMethod": "GET"},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
+            DEFAULT_AUTOMAP_PARAMS,
             [
                 "Use Request.method",
                 "does not match the Zyte API httpRequestMethod",
@@ -1003,8 +1089,7 @@ async def test_automap_header_output(meta, expected, warnings, caplog):
             "POST",
             {"httpRequestMethod": "PUT"},
             {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
+                **DEFAULT_AUTOMAP_PARAMS,
                 "httpRequestMethod": "PUT",
             },
             [
@@ -1048,6 +1133,153 @@ async def test_automap_method(method, meta, expected, warnings, caplog):
     await _test_automap({}, {"method": method}, meta, expected, warnings, caplog)
 
 
+# Zyte Smart Proxy Manager headers, as (header, value, meta, expected,
+# warning) tuples, where meta and expected extend those of the main output.
+SPM_HEADER_CASE = Tuple[str, str, Dict[str, Any], Dict[str, Any], str]
+SPM_HEADER_CASES: Tuple[SPM_HEADER_CASE, ...] = (
+    # Headers without a Zyte API counterpart are dropped.
+    *(
+        (header, value, {}, {}, "This header has been dropped")
+        for header, value in (
+            ("X-Crawlera-Foo", "Bar"),
+            ("X-Crawlera-Client", "Custom client string"),
+            ("X-Crawlera-Max-Retries", "1"),
+            ("X-Crawlera-No-Bancheck", "1"),
+            ("X-Crawlera-Profile-Pass", "foo"),
+            ("X-Crawlera-Session", "foo"),
+            ("X-Crawlera-Timeout", "40000"),
+            ("X-Crawlera-Use-Https", "1"),
+        )
+    ),
+    # Headers with a Zyte API counterpart that takes any value are mapped
+    # to it, unless the parameter is already defined.
+    *(
+        case
+        for header, param in (
+            ("X-Crawlera-JobId", "jobId"),
+            ("X-Crawlera-Region", "geolocation"),
+        )
+        for case in (
+            (
+                header,
+                "foo",
+                {},
+                {param: "foo"},
+                "has been assigned to the matching Zyte API request parameter",
+            ),
+            (
+                header,
+                "foo",
+                {param: "bar"},
+                {param: "bar"},
+                "has already been defined on the request",
+            ),
+        )
+    ),
+    (
+        "X-Crawlera-Cookies",
+        "enable",
+        {},
+        {},
+        "To achieve the same behavior with Zyte API, do not set request cookies",
+    ),
+    (
+        "X-Crawlera-Cookies",
+        "disable",
+        {},
+        {},
+        "it is the default behavior of Zyte API",
+    ),
+    (
+        "X-Crawlera-Cookies",
+        "discard",
+        {},
+        {"cookieManagement": "discard"},
+        "has been assigned to the matching Zyte API request parameter",
+    ),
+    (
+        "X-Crawlera-Cookies",
+        "foo",
+        {"cookieManagement": "bar"},
+        {"cookieManagement": "bar"},
+        "has already been defined on the request",
+    ),
+    (
+        "X-Crawlera-Cookies",
+        "foo",
+        {},
+        {},
+        "cannot be mapped to a Zyte API request parameter",
+    ),
+)
+# X-Crawlera-Profile is mapped to device only for HTTP requests.
+SPM_HTTP_PROFILE_CASES: Tuple[SPM_HEADER_CASE, ...] = (
+    (
+        "X-Crawlera-Profile",
+        "pass",
+        {},
+        {},
+        "cannot be mapped to the matching Zyte API request parameter",
+    ),
+    (
+        "X-Crawlera-Profile",
+        "desktop",
+        {},
+        {"device": "desktop"},
+        "has been assigned to the matching Zyte API request parameter",
+    ),
+    (
+        "X-Crawlera-Profile",
+        "mobile",
+        {},
+        {"device": "mobile"},
+        "has been assigned to the matching Zyte API request parameter",
+    ),
+    (
+        "X-Crawlera-Profile",
+        "foo",
+        {},
+        {},
+        "cannot be mapped to the matching Zyte API request parameter",
+    ),
+    (
+        "X-Crawlera-Profile",
+        "foo",
+        {"device": "bar"},
+        {"device": "bar"},
+        "has already been defined on the request",
+    ),
+)
+SPM_BROWSER_PROFILE_CASES: Tuple[SPM_HEADER_CASE, ...] = (
+    *(
+        ("X-Crawlera-Profile", value, {}, {}, "This header has been dropped")
+        for value in ("pass", "desktop", "mobile", "foo")
+    ),
+    # Zyte API does not support device for browser requests, it will trigger
+    # a 400 response, but we allow it for forward compatibility, i.e. in case
+    # it is supported in the future.
+    (
+        "X-Crawlera-Profile",
+        "foo",
+        {"device": "bar"},
+        {"device": "bar"},
+        "This header has been dropped",
+    ),
+)
+
+
+# Header parameters expected for a Referer: a request header, depending on
+# whether extraction happens from httpResponseBody or from browserHtml.
+EXTRACT_HTTP_HEADER_PARAMS: Dict[str, Any] = {
+    "customHttpRequestHeaders": [
+        {"name": "Referer", "value": "a"},
+    ],
+}
+EXTRACT_BROWSER_HEADER_PARAMS: Dict[str, Any] = {
+    "requestHeaders": {"referer": "a"},
+}
+
+
 @pytest.mark.parametrize(
     "headers,meta,expected,warnings",
     [
@@ -1202,10 +1434,7 @@ async def test_automap_method(method, meta, expected, warnings, caplog):
         (
             {"Referer": "a"},
             {"customHttpRequestHeaders": False},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
+            DEFAULT_AUTOMAP_PARAMS,
             [],
         ),
         (
@@ -1289,10 +1518,7 @@ async def test_automap_method(method, meta, expected, warnings, caplog):
         (
             {"Referer": None},
             {},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
+            DEFAULT_AUTOMAP_PARAMS,
             [],
         ),
         (
@@ -1353,8 +1579,7 @@ async def test_automap_method(method, meta, expected, warnings, caplog):
             {"Referer": None},
             {"unknownMainOutput": True},
             {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
+                **DEFAULT_AUTOMAP_PARAMS,
                 "unknownMainOutput": True,
             },
             [],
@@ -1474,8 +1699,7 @@ async def test_automap_method(method, meta, expected, warnings, caplog):
                 "requestHeaders": {"referer": "a"},
             },
             {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
+                **DEFAULT_AUTOMAP_PARAMS,
                 "requestHeaders": {"referer": "a"},
             },
             [],
@@ -1582,606 +1806,131 @@ async def test_automap_method(method, meta, expected, warnings, caplog):
             [],
         ),
         # Zyte Smart Proxy Manager special header handling.
-        (
-            {"X-Crawlera-Foo": "Bar"},
-            {},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-Client": "Custom client string"},
-            {},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-Cookies": "enable"},
-            {},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            ["To achieve the same behavior with Zyte API, do not set request cookies"],
-        ),
-        (
-            {"X-Crawlera-Cookies": "disable"},
-            {},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            ["it is the default behavior of Zyte API"],
+        *(
+            (
+                {header: value},
+                {**output_meta, **meta},
+                {**output_expected, **expected},
+                [warning],
+            )
+            for output_meta, output_expected, cases in (
+                (
+                    {},
+                    DEFAULT_AUTOMAP_PARAMS,
+                    (*SPM_HEADER_CASES, *SPM_HTTP_PROFILE_CASES),
+                ),
+                (
+                    {"browserHtml": True},
+                    {"browserHtml": True},
+                    (*SPM_HEADER_CASES, *SPM_BROWSER_PROFILE_CASES),
+                ),
+            )
+            for header, value, meta, expected, warning in cases
         ),
-        (
-            {"X-Crawlera-Cookies": "discard"},
-            {},
-            {
-                "cookieManagement": "discard",
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            ["has been assigned to the matching Zyte API request parameter"],
+        # The extraction source affects header mapping.
+        *(
+            ({"Referer": "a"}, meta, {**meta, **header_params}, [])
+            for meta, header_params in (
+                (
+                    {
+                        EXTRACT_KEY: True,
+                        EXTRACT_KEY_OPTIONS: {"extractFrom": "httpResponseBody"},
+                    },
+                    EXTRACT_HTTP_HEADER_PARAMS,
+                ),
+                (
+                    {
+                        EXTRACT_KEY: True,
+                        EXTRACT_KEY_OPTIONS: {"extractFrom": "browserHtml"},
+                    },
+                    EXTRACT_BROWSER_HEADER_PARAMS,
+                ),
+                # Only *Options parameters matching enabled extraction outputs
+                # are taken into account.
+                (
+                    {
+                        EXTRACT_KEY: True,
+                        EXTRACT_KEY_2_OPTIONS: {"extractFrom": "httpResponseBody"},
+                    },
+                    EXTRACT_BROWSER_HEADER_PARAMS,
+                ),
+                # Combining 2 matching extractFrom works as a single one.
+                (
+                    {
+                        EXTRACT_KEY: True,
+                        EXTRACT_KEY_OPTIONS: {"extractFrom": "httpResponseBody"},
+                        EXTRACT_KEY_2: True,
+                        EXTRACT_KEY_2_OPTIONS: {"extractFrom": "httpResponseBody"},
+                    },
+                    EXTRACT_HTTP_HEADER_PARAMS,
+                ),
+                # Combining 2 conflicting extractFrom causes request headers to
+                # be mapped both ways.
+                (
+                    {
+                        EXTRACT_KEY: True,
+                        EXTRACT_KEY_OPTIONS: {"extractFrom": "httpResponseBody"},
+                        EXTRACT_KEY_2: True,
+                    },
+                    {**EXTRACT_HTTP_HEADER_PARAMS, **EXTRACT_BROWSER_HEADER_PARAMS},
+                ),
+                (
+                    {
+                        EXTRACT_KEY: True,
+                        EXTRACT_KEY_OPTIONS: {"extractFrom": "httpResponseBody"},
+                        EXTRACT_KEY_2: True,
+                        EXTRACT_KEY_2_OPTIONS: {"extractFrom": "browserHtml"},
+                    },
+                    {**EXTRACT_HTTP_HEADER_PARAMS, **EXTRACT_BROWSER_HEADER_PARAMS},
+                ),
+            )
         ),
+    ],
+)
+@ensureDeferred
+async def test_automap_headers(headers, meta, expected, warnings, caplog):
+    await _test_automap({}, {"headers": headers}, meta, expected, warnings, caplog)
+
+
+@pytest.mark.parametrize(
+    "settings,headers,meta,expected,warnings",
+    [
+        # You may update the ZYTE_API_SKIP_HEADERS setting to remove
+        # headers that the customHttpRequestHeaders parameter starts supporting
+        # in the future.
         (
-            {"X-Crawlera-Cookies": "foo"},
-            {
-                "cookieManagement": "bar",
-            },
             {
-                "cookieManagement": "bar",
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
+                "ZYTE_API_SKIP_HEADERS": [],
             },
-            ["has already been defined on the request"],
-        ),
-        (
-            {"X-Crawlera-Cookies": "foo"},
-            {},
             {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
+                "User-Agent": "",
             },
-            ["cannot be mapped to a Zyte API request parameter"],
-        ),
-        (
-            {"X-Crawlera-JobId": "foo"},
             {},
             {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-                "jobId": "foo",
+                **DEFAULT_AUTOMAP_PARAMS,
+                "customHttpRequestHeaders": [
+                    {"name": "User-Agent", "value": ""},
+                ],
             },
-            ["has been assigned to the matching Zyte API request parameter"],
+            [],
         ),
+        # You may update the ZYTE_API_BROWSER_HEADERS setting to extend support
+        # for new fields that the requestHeaders parameter may support in the
+        # future.
         (
-            {"X-Crawlera-JobId": "foo"},
             {
-                "jobId": "bar",
+                "ZYTE_API_BROWSER_HEADERS": {
+                    "referer": "referer",
+                    "user-agent": "userAgent",
+                },
             },
+            {"User-Agent": ""},
+            {"browserHtml": True},
             {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-                "jobId": "bar",
+                "browserHtml": True,
+                "requestHeaders": {"userAgent": ""},
             },
-            ["has already been defined on the request"],
-        ),
-        (
-            {"X-Crawlera-Max-Retries": "1"},
-            {},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-No-Bancheck": "1"},
-            {},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-Profile": "pass"},
-            {},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            ["cannot be mapped to the matching Zyte API request parameter"],
-        ),
-        (
-            {"X-Crawlera-Profile": "desktop"},
-            {},
-            {
-                "device": "desktop",
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            ["has been assigned to the matching Zyte API request parameter"],
-        ),
-        (
-            {"X-Crawlera-Profile": "mobile"},
-            {},
-            {
-                "device": "mobile",
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            ["has been assigned to the matching Zyte API request parameter"],
-        ),
-        (
-            {"X-Crawlera-Profile": "foo"},
-            {},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            ["cannot be mapped to the matching Zyte API request parameter"],
-        ),
-        (
-            {"X-Crawlera-Profile": "foo"},
-            {
-                "device": "bar",
-            },
-            {
-                "device": "bar",
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            ["has already been defined on the request"],
-        ),
-        (
-            {"X-Crawlera-Profile-Pass": "foo"},
-            {},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-Region": "foo"},
-            {},
-            {
-                "geolocation": "foo",
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            ["has been assigned to the matching Zyte API request parameter"],
-        ),
-        (
-            {"X-Crawlera-Region": "foo"},
-            {
-                "geolocation": "bar",
-            },
-            {
-                "geolocation": "bar",
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            ["has already been defined on the request"],
-        ),
-        (
-            {"X-Crawlera-Session": "foo"},
-            {},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-Timeout": "40000"},
-            {},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-Use-Https": "1"},
-            {},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-Foo": "Bar"},
-            {
-                "browserHtml": True,
-            },
-            {
-                "browserHtml": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-Client": "Custom client string"},
-            {
-                "browserHtml": True,
-            },
-            {
-                "browserHtml": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-Cookies": "enable"},
-            {
-                "browserHtml": True,
-            },
-            {
-                "browserHtml": True,
-            },
-            ["To achieve the same behavior with Zyte API, do not set request cookies"],
-        ),
-        (
-            {"X-Crawlera-Cookies": "disable"},
-            {
-                "browserHtml": True,
-            },
-            {
-                "browserHtml": True,
-            },
-            ["it is the default behavior of Zyte API"],
-        ),
-        (
-            {"X-Crawlera-Cookies": "discard"},
-            {
-                "browserHtml": True,
-            },
-            {
-                "browserHtml": True,
-                "cookieManagement": "discard",
-            },
-            ["has been assigned to the matching Zyte API request parameter"],
-        ),
-        (
-            {"X-Crawlera-Cookies": "foo"},
-            {
-                "browserHtml": True,
-                "cookieManagement": "bar",
-            },
-            {
-                "browserHtml": True,
-                "cookieManagement": "bar",
-            },
-            ["has already been defined on the request"],
-        ),
-        (
-            {"X-Crawlera-Cookies": "foo"},
-            {
-                "browserHtml": True,
-            },
-            {
-                "browserHtml": True,
-            },
-            ["cannot be mapped to a Zyte API request parameter"],
-        ),
-        (
-            {"X-Crawlera-JobId": "foo"},
-            {
-                "browserHtml": True,
-            },
-            {
-                "browserHtml": True,
-                "jobId": "foo",
-            },
-            ["has been assigned to the matching Zyte API request parameter"],
-        ),
-        (
-            {"X-Crawlera-JobId": "foo"},
-            {
-                "browserHtml": True,
-                "jobId": "bar",
-            },
-            {
-                "browserHtml": True,
-                "jobId": "bar",
-            },
-            ["has already been defined on the request"],
-        ),
-        (
-            {"X-Crawlera-Max-Retries": "1"},
-            {
-                "browserHtml": True,
-            },
-            {
-                "browserHtml": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-No-Bancheck": "1"},
-            {
-                "browserHtml": True,
-            },
-            {
-                "browserHtml": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-Profile": "pass"},
-            {
-                "browserHtml": True,
-            },
-            {
-                "browserHtml": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-Profile": "desktop"},
-            {
-                "browserHtml": True,
-            },
-            {
-                "browserHtml": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-Profile": "mobile"},
-            {
-                "browserHtml": True,
-            },
-            {
-                "browserHtml": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-Profile": "foo"},
-            {
-                "browserHtml": True,
-            },
-            {
-                "browserHtml": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-Profile": "foo"},
-            {
-                # Zyte API does not support it, it will trigger a 400 response,
-                # but we allow it for forward compatibility, i.e. in case it is
-                # supported in the future.
-                "device": "bar",
-                "browserHtml": True,
-            },
-            {
-                "device": "bar",
-                "browserHtml": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-Profile-Pass": "foo"},
-            {
-                "browserHtml": True,
-            },
-            {
-                "browserHtml": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-Region": "foo"},
-            {
-                "browserHtml": True,
-            },
-            {
-                "browserHtml": True,
-                "geolocation": "foo",
-            },
-            ["has been assigned to the matching Zyte API request parameter"],
-        ),
-        (
-            {"X-Crawlera-Region": "foo"},
-            {
-                "browserHtml": True,
-                "geolocation": "bar",
-            },
-            {
-                "browserHtml": True,
-                "geolocation": "bar",
-            },
-            ["has already been defined on the request"],
-        ),
-        (
-            {"X-Crawlera-Session": "foo"},
-            {
-                "browserHtml": True,
-            },
-            {
-                "browserHtml": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-Timeout": "40000"},
-            {
-                "browserHtml": True,
-            },
-            {
-                "browserHtml": True,
-            },
-            ["This header has been dropped"],
-        ),
-        (
-            {"X-Crawlera-Use-Https": "1"},
-            {
-                "browserHtml": True,
-            },
-            {
-                "browserHtml": True,
-            },
-            ["This header has been dropped"],
-        ),
-        # The extraction source affects header mapping.
-        (
-            {"Referer": "a"},
-            {
-                EXTRACT_KEY: True,
-                f"{EXTRACT_KEY}Options": {"extractFrom": "httpResponseBody"},
-            },
-            {
-                EXTRACT_KEY: True,
-                f"{EXTRACT_KEY}Options": {"extractFrom": "httpResponseBody"},
-                "customHttpRequestHeaders": [
-                    {"name": "Referer", "value": "a"},
-                ],
-            },
-            [],
-        ),
-        (
-            {"Referer": "a"},
-            {
-                EXTRACT_KEY: True,
-                f"{EXTRACT_KEY}Options": {"extractFrom": "browserHtml"},
-            },
-            {
-                EXTRACT_KEY: True,
-                f"{EXTRACT_KEY}Options": {"extractFrom": "browserHtml"},
-                "requestHeaders": {"referer": "a"},
-            },
-            [],
-        ),
-        # Only *Options parameters matching enabled extraction outputs are
-        # taken into account.
-        (
-            {"Referer": "a"},
-            {
-                EXTRACT_KEY: True,
-                f"{EXTRACT_KEY_2}Options": {"extractFrom": "httpResponseBody"},
-            },
-            {
-                EXTRACT_KEY: True,
-                f"{EXTRACT_KEY_2}Options": {"extractFrom": "httpResponseBody"},
-                "requestHeaders": {"referer": "a"},
-            },
-            [],
-        ),
-        # Combining 2 matching extractFrom works as a single one.
-        (
-            {"Referer": "a"},
-            {
-                EXTRACT_KEY: True,
-                f"{EXTRACT_KEY}Options": {"extractFrom": "httpResponseBody"},
-                EXTRACT_KEY_2: True,
-                f"{EXTRACT_KEY_2}Options": {"extractFrom": "httpResponseBody"},
-            },
-            {
-                EXTRACT_KEY: True,
-                f"{EXTRACT_KEY}Options": {"extractFrom": "httpResponseBody"},
-                EXTRACT_KEY_2: True,
-                f"{EXTRACT_KEY_2}Options": {"extractFrom": "httpResponseBody"},
-                "customHttpRequestHeaders": [
-                    {"name": "Referer", "value": "a"},
-                ],
-            },
-            [],
-        ),
-        # Combining 2 conflicting extractFrom causes request headers to be
-        # mapped both ways.
-        (
-            {"Referer": "a"},
-            {
-                EXTRACT_KEY: True,
-                f"{EXTRACT_KEY}Options": {"extractFrom": "httpResponseBody"},
-                EXTRACT_KEY_2: True,
-            },
-            {
-                EXTRACT_KEY: True,
-                f"{EXTRACT_KEY}Options": {"extractFrom": "httpResponseBody"},
-                EXTRACT_KEY_2: True,
-                "customHttpRequestHeaders": [
-                    {"name": "Referer", "value": "a"},
-                ],
-                "requestHeaders": {"referer": "a"},
-            },
-            [],
-        ),
-        (
-            {"Referer": "a"},
-            {
-                EXTRACT_KEY: True,
-                f"{EXTRACT_KEY}Options": {"extractFrom": "httpResponseBody"},
-                EXTRACT_KEY_2: True,
-                f"{EXTRACT_KEY_2}Options": {"extractFrom": "browserHtml"},
-            },
-            {
-                EXTRACT_KEY: True,
-                f"{EXTRACT_KEY}Options": {"extractFrom": "httpResponseBody"},
-                EXTRACT_KEY_2: True,
-                f"{EXTRACT_KEY_2}Options": {"extractFrom": "browserHtml"},
-                "customHttpRequestHeaders": [
-                    {"name": "Referer", "value": "a"},
-                ],
-                "requestHeaders": {"referer": "a"},
-            },
-            [],
-        ),
-    ],
-)
-@ensureDeferred
-async def test_automap_headers(headers, meta, expected, warnings, caplog):
-    await _test_automap({}, {"headers": headers}, meta, expected, warnings, caplog)
-
-
-@pytest.mark.parametrize(
-    "settings,headers,meta,expected,warnings",
-    [
-        # You may update the ZYTE_API_SKIP_HEADERS setting to remove
-        # headers that the customHttpRequestHeaders parameter starts supporting
-        # in the future.
-        (
-            {
-                "ZYTE_API_SKIP_HEADERS": [],
-            },
-            {
-                "User-Agent": "",
-            },
-            {},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-                "customHttpRequestHeaders": [
-                    {"name": "User-Agent", "value": ""},
-                ],
-            },
-            [],
-        ),
-        # You may update the ZYTE_API_BROWSER_HEADERS setting to extend support
-        # for new fields that the requestHeaders parameter may support in the
-        # future.
-        (
-            {
-                "ZYTE_API_BROWSER_HEADERS": {
-                    "referer": "referer",
-                    "user-agent": "userAgent",
-                },
-            },
-            {"User-Agent": ""},
-            {"browserHtml": True},
-            {
-                "browserHtml": True,
-                "requestHeaders": {"userAgent": ""},
-            },
-            [],
+            [],
         ),
     ],
 )
@@ -2218,16 +1967,9 @@ REQUEST_OUTPUT_COOKIES_MAXIMAL = [
                 input_cookies,
                 {},
                 {},
-                {
-                    "httpResponseBody": True,
-                    "httpResponseHeaders": True,
-                },
+                DEFAULT_AUTOMAP_PARAMS,
                 setup_warnings
-                or (
-                    run_time_warnings
-                    if cast(Dict, settings).get("COOKIES_ENABLED", True)
-                    else []
-                ),
+                or (run_time_warnings if settings.get("COOKIES_ENABLED", True) else []),
                 [],
             )
             for input_cookies, run_time_warnings in (
@@ -2284,11 +2026,10 @@ REQUEST_OUTPUT_COOKIES_MAXIMAL = [
                 {},
                 {},
                 {
-                    "httpResponseBody": True,
-                    "httpResponseHeaders": True,
+                    **DEFAULT_AUTOMAP_PARAMS,
                     "experimental": {
                         "responseCookies": True,
-                        **cast(Dict, output_cookies),
+                        **output_cookies,
                     },
                 },
                 [],
@@ -2327,8 +2068,7 @@ REQUEST_OUTPUT_COOKIES_MAXIMAL = [
                     }
                 },
                 {
-                    "httpResponseBody": True,
-                    "httpResponseHeaders": True,
+                    **DEFAULT_AUTOMAP_PARAMS,
                     "experimental": {
                         "requestCookies": REQUEST_OUTPUT_COOKIES_MINIMAL,
                     },
@@ -2344,37 +2084,24 @@ REQUEST_OUTPUT_COOKIES_MAXIMAL = [
             )
         ),
         # dont_merge_cookies=True on request metadata disables cookies.
-        (
-            {
-                "ZYTE_API_EXPERIMENTAL_COOKIES_ENABLED": True,
-            },
-            REQUEST_INPUT_COOKIES_EMPTY,
-            {
-                "dont_merge_cookies": True,
-            },
-            {},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            [],
-            [],
-        ),
-        (
-            {
-                "ZYTE_API_EXPERIMENTAL_COOKIES_ENABLED": True,
-            },
-            REQUEST_INPUT_COOKIES_MINIMAL_DICT,
-            {
-                "dont_merge_cookies": True,
-            },
-            {},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
-            [],
-            [],
+        *(
+            (
+                {
+                    "ZYTE_API_EXPERIMENTAL_COOKIES_ENABLED": True,
+                },
+                input_cookies,
+                {
+                    "dont_merge_cookies": True,
+                },
+                {},
+                DEFAULT_AUTOMAP_PARAMS,
+                [],
+                [],
+            )
+            for input_cookies in (
+                REQUEST_INPUT_COOKIES_EMPTY,
+                REQUEST_INPUT_COOKIES_MINIMAL_DICT,
+            )
         ),
         # Do not warn about request cookies not being mapped if
         # dont_merge_cookies=True is set on request metadata.
@@ -2386,10 +2113,7 @@ REQUEST_OUTPUT_COOKIES_MAXIMAL = [
                     "dont_merge_cookies": True,
                 },
                 {},
-                {
-                    "httpResponseBody": True,
-                    "httpResponseHeaders": True,
-                },
+                DEFAULT_AUTOMAP_PARAMS,
                 [],
                 [
                     {
@@ -2419,10 +2143,7 @@ REQUEST_OUTPUT_COOKIES_MAXIMAL = [
                     "responseCookies": False,
                 }
             },
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
+            DEFAULT_AUTOMAP_PARAMS,
             [],
             [],
         ),
@@ -2438,8 +2159,7 @@ REQUEST_OUTPUT_COOKIES_MAXIMAL = [
                 }
             },
             {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
+                **DEFAULT_AUTOMAP_PARAMS,
                 "experimental": {"responseCookies": True},
             },
             [],
@@ -2457,10 +2177,7 @@ REQUEST_OUTPUT_COOKIES_MAXIMAL = [
                     "requestCookies": False,
                 }
             },
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
+            DEFAULT_AUTOMAP_PARAMS,
             [],
             [],
         ),
@@ -2476,8 +2193,7 @@ REQUEST_OUTPUT_COOKIES_MAXIMAL = [
                 }
             },
             {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
+                **DEFAULT_AUTOMAP_PARAMS,
                 "experimental": {
                     "requestCookies": REQUEST_OUTPUT_COOKIES_MINIMAL,
                 },
@@ -2497,8 +2213,7 @@ REQUEST_OUTPUT_COOKIES_MAXIMAL = [
                 }
             },
             {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
+                **DEFAULT_AUTOMAP_PARAMS,
                 "experimental": {"responseCookies": True},
             },
             [],
@@ -2516,10 +2231,7 @@ REQUEST_OUTPUT_COOKIES_MAXIMAL = [
                     "requestCookies": False,
                 }
             },
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
+            DEFAULT_AUTOMAP_PARAMS,
             [],
             [],
         ),
@@ -2538,8 +2250,7 @@ REQUEST_OUTPUT_COOKIES_MAXIMAL = [
                 }
             },
             {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
+                **DEFAULT_AUTOMAP_PARAMS,
                 "experimental": {
                     "requestCookies": [],
                     "responseCookies": True,
@@ -2609,7 +2320,7 @@ REQUEST_OUTPUT_COOKIES_MAXIMAL = [
             [],
         ),
         # Cookies are mapped correctly, both with minimum and maximum cookie
-        # parameters.
+        # parameters. (The minimal dict input is covered above.)
         *(
             (
                 {
@@ -2619,8 +2330,7 @@ REQUEST_OUTPUT_COOKIES_MAXIMAL = [
                 {},
                 {},
                 {
-                    "httpResponseBody": True,
-                    "httpResponseHeaders": True,
+                    **DEFAULT_AUTOMAP_PARAMS,
                     "experimental": {
                         "responseCookies": True,
                         "requestCookies": output,
@@ -2630,10 +2340,6 @@ REQUEST_OUTPUT_COOKIES_MAXIMAL = [
                 [],
             )
             for input, output in (
-                (
-                    REQUEST_INPUT_COOKIES_MINIMAL_DICT,
-                    REQUEST_OUTPUT_COOKIES_MINIMAL,
-                ),
                 (
                     REQUEST_INPUT_COOKIES_MINIMAL_LIST,
                     REQUEST_OUTPUT_COOKIES_MINIMAL,
@@ -2657,8 +2363,7 @@ REQUEST_OUTPUT_COOKIES_MAXIMAL = [
                 },
             },
             {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
+                **DEFAULT_AUTOMAP_PARAMS,
                 "experimental": {
                     "responseCookies": True,
                     "requestCookies": REQUEST_OUTPUT_COOKIES_MAXIMAL,
@@ -2676,8 +2381,7 @@ REQUEST_OUTPUT_COOKIES_MAXIMAL = [
             {},
             {},
             {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
+                **DEFAULT_AUTOMAP_PARAMS,
                 "experimental": {
                     "responseCookies": True,
                     "requestCookies": [
@@ -2728,12 +2432,10 @@ async def test_automap_all_cookies(meta):
     param_parser = handler._param_parser
 
     # Start from a cookiejar with an existing cookie for a.example.
-    pre_request = Request(
-        url="https://a.example",
-        meta=meta,
-        cookies={"a": "b"},
+    _set_cookies(
+        cookie_middleware.jars[None],
+        [{"name": "a", "value": "b", "domain": "a.example"}],
     )
-    cookie_middleware.process_request(pre_request, spider=None)
 
     # Send a request to c.example, with a cookie for b.example, and ensure that
     # it includes the cookies for a.example and b.example.
@@ -2903,7 +2605,7 @@ async def test_automap_cookie_limit(meta, caplog):
     assert api_params["experimental"]["requestCookies"] == [
         {"name": "z", "value": "y", "domain": "example.com"}
     ]
-    assert not caplog.records
+    _assert_log_messages(caplog, [])
     caplog.clear()
 
     # Verify that requests with 2 cookies results in only 1 cookie set and a
@@ -2921,18 +2623,15 @@ async def test_automap_cookie_limit(meta, caplog):
         [{"name": "z", "value": "y", "domain": "example.com"}],
         [{"name": "x", "value": "w", "domain": "example.com"}],
     ]
-    assert "would get 2 cookies" in caplog.text
-    assert "limited to 1 cookies" in caplog.text
+    _assert_log_messages(caplog, ["would get 2 cookies", "limited to 1 cookies"])
     caplog.clear()
 
     # Verify that 1 cookie in the cookie jar and 1 cookie in the request count
     # as 2 cookies, resulting in only 1 cookie set and a warning.
-    pre_request = Request(
-        url="https://example.com/1",
-        meta={**meta, "cookiejar": cookiejar},
-        cookies={"z": "y"},
+    _set_cookies(
+        cookie_middleware.jars[cookiejar],
+        [{"name": "z", "value": "y", "domain": "example.com"}],
     )
-    cookie_middleware.process_request(pre_request, spider=None)
     request = Request(
         url="https://example.com/1",
         meta={**meta, "cookiejar": cookiejar},
@@ -2946,17 +2645,14 @@ async def test_automap_cookie_limit(meta, caplog):
         [{"name": "z", "value": "y", "domain": "example.com"}],
         [{"name": "x", "value": "w", "domain": "example.com"}],
     ]
-    assert "would get 2 cookies" in caplog.text
-    assert "limited to 1 cookies" in caplog.text
+    _assert_log_messages(caplog, ["would get 2 cookies", "limited to 1 cookies"])
     caplog.clear()
 
     # Vefify that unrelated-domain cookies count for the limit.
-    pre_request = Request(
-        url="https://other.example/1",
-        meta={**meta, "cookiejar": cookiejar},
-        cookies={"z": "y"},
+    _set_cookies(
+        cookie_middleware.jars[cookiejar],
+        [{"name": "z", "value": "y", "domain": "other.example"}],
     )
-    cookie_middleware.process_request(pre_request, spider=None)
     request = Request(
         url="https://example.com/1",
         meta={**meta, "cookiejar": cookiejar},
@@ -2970,9 +2666,7 @@ async def test_automap_cookie_limit(meta, caplog):
         [{"name": "z", "value": "y", "domain": "other.example"}],
         [{"name": "x", "value": "w", "domain": "example.com"}],
     ]
-    assert "would get 2 cookies" in caplog.text
-    assert "limited to 1 cookies" in caplog.text
-    caplog.clear()
+    _assert_log_messages(caplog, ["would get 2 cookies", "limited to 1 cookies"])
 
 
 class CustomCookieJar(CookieJar):
@@ -3039,8 +2733,7 @@ async def test_automap_custom_cookie_middleware():
             "a",
             {},
             {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
+                **DEFAULT_AUTOMAP_PARAMS,
                 "httpRequestBody": "YQ==",
             },
             [],
@@ -3051,8 +2744,7 @@ async def test_automap_custom_cookie_middleware():
             "a",
             {"httpRequestBody": "Yg=="},
             {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
+                **DEFAULT_AUTOMAP_PARAMS,
                 "httpRequestBody": "Yg==",
             },
             [
@@ -3066,8 +2758,7 @@ async def test_automap_custom_cookie_middleware():
             "a",
             {"httpRequestBody": "YQ=="},
             {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
+                **DEFAULT_AUTOMAP_PARAMS,
                 "httpRequestBody": "YQ==",
             },
             ["Use Request.body instead"],
@@ -3128,20 +2819,14 @@ async def test_automap_body(body, meta, expected, warnings, caplog):
             {
                 "browserHtml": False,
             },
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
+            DEFAULT_AUTOMAP_PARAMS,
             ["unnecessarily defines"],
         ),
         (
             {
                 "screenshot": False,
             },
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
+            DEFAULT_AUTOMAP_PARAMS,
             ["unnecessarily defines"],
         ),
         (
@@ -3158,10 +2843,7 @@ async def test_automap_body(body, meta, expected, warnings, caplog):
             {
                 EXTRACT_KEY: False,
             },
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
+            DEFAULT_AUTOMAP_PARAMS,
             ["unnecessarily defines"],
         ),
         (
@@ -3195,10 +2877,7 @@ async def test_automap_default_parameter_cleanup(meta, expected, warnings, caplo
         (
             {},
             {},
-            {
-                "httpResponseBody": True,
-                "httpResponseHeaders": True,
-            },
+            DEFAULT_AUTOMAP_PARAMS,
             [],
         ),
     ],
@@ -3214,19 +2893,13 @@ async def test_default_params_automap(default_params, meta, expected, warnings,
         "ZYTE_API_AUTOMAP_PARAMS": default_params,
         "ZYTE_API_TRANSPARENT_MODE": True,
     }
-    crawler = await get_crawler(settings)
-    handler = get_download_handler(crawler, "https")
-    param_parser = handler._param_parser
+    param_parser = await _get_param_parser(settings)
     caplog.clear()
     with caplog.at_level("WARNING"):
         api_params = param_parser.parse(request)
     api_params.pop("url")
     assert api_params == expected
-    if warnings:
-        for warning in warnings:
-            assert warning in caplog.text
-    else:
-        assert not caplog.records
+    _assert_log_messages(caplog, warnings)
 
 
 @pytest.mark.parametrize(
@@ -3244,9 +2917,7 @@ async def test_default_params_false(default_params):
     settings = {
         "ZYTE_API_DEFAULT_PARAMS": default_params,
     }
-    crawler = await get_crawler(settings)
-    handler = get_download_handler(crawler, "https")
-    param_parser = handler._param_parser
+    param_parser = await _get_param_parser(settings)
     api_params = param_parser.parse(request)
     assert api_params is None
 
@@ -3255,10 +2926,13 @@ async def test_default_params_false(default_params):
 async def _process_request(crawler, request, is_start_request=False):
     spider = crawler.spider
 
-    await crawler.engine.scraper.open_spider(spider)
-    await crawler.engine.signals.send_catch_log_deferred(
-        signals.spider_opened, spider=spider
-    )
+    # Crawlers may be shared across tests (see _get_cached_crawler), so only
+    # open the spider the first time a request is processed with a crawler.
+    if crawler.engine.scraper.slot is None:
+        await crawler.engine.scraper.open_spider(spider)
+        await crawler.engine.signals.send_catch_log_deferred(
+            signals.spider_opened, spider=spider
+        )
 
     spider_middlewares = crawler.engine.scraper.spidermw
     if is_start_request:
@@ -3273,15 +2947,34 @@ async def _process_request(crawler, request, is_start_request=False):
     downloader_middlewares = crawler.engine.downloader.middleware
     for process_request in downloader_middlewares.methods["process_request"]:
         result = process_request(request=request, spider=spider)
-        if asyncio.isfuture(result) or inspect.isawaitable(result):
+        if inspect.isawaitable(result):
             await result
 
 
+# Headers that Scrapy and its built-in middlewares set by default to a fixed
+# value, with that value. Referer is not included, because its value depends on
+# the source response.
+MIDDLEWARE_DEFAULT_HEADERS = {
+    **DEFAULT_REQUEST_HEADERS,
+    "Accept-Encoding": DEFAULT_ACCEPT_ENCODING,
+    "User-Agent": DEFAULT_USER_AGENT,
+}
+
+# Default ZYTE_API_SKIP_HEADERS values, as strings, to extend them in settings.
+DEFAULT_SKIP_HEADERS = sorted(header.decode() for header in SKIP_HEADERS)
+
+# ZYTE_API_SKIP_HEADERS values that, on top of the default skip headers, skip
+# every header set by default by Scrapy and its built-in middlewares.
+MIDDLEWARE_SKIP_HEADERS = sorted(
+    {*DEFAULT_SKIP_HEADERS, *MIDDLEWARE_DEFAULT_HEADERS, "Referer"}
+)
+
+
 @ensureDeferred
 async def test_middleware_headers_start_requests():
     """By default, automap should not generate a customHttpRequestHeaders
     parameter."""
-    crawler = await get_crawler({"ZYTE_API_TRANSPARENT_MODE": True})
+    crawler = await _get_cached_crawler({"ZYTE_API_TRANSPARENT_MODE": True})
     request = Request(url="https://example.com")
     await _process_request(crawler, request, is_start_request=True)
 
@@ -3299,7 +2992,7 @@ async def test_middleware_headers_cb_requests_disable():
         "REFERER_ENABLED": False,
         "ZYTE_API_TRANSPARENT_MODE": True,
     }
-    crawler = await get_crawler(settings)
+    crawler = await _get_cached_crawler(settings)
     request = Request(url="https://example.com")
     await _process_request(crawler, request)
 
@@ -3314,15 +3007,10 @@ async def test_middleware_headers_cb_requests_skip():
     """Callback requests will not include the Referer parameter if the Referer
     header is configured to be skipped."""
     settings = {
-        "ZYTE_API_SKIP_HEADERS": list(
-            set(header.decode() for header in SKIP_HEADERS)
-            | {
-                "Referer",
-            }
-        ),
+        "ZYTE_API_SKIP_HEADERS": [*DEFAULT_SKIP_HEADERS, "Referer"],
         "ZYTE_API_TRANSPARENT_MODE": True,
     }
-    crawler = await get_crawler(settings)
+    crawler = await _get_cached_crawler(settings)
     request = Request(url="https://example.com")
     await _process_request(crawler, request)
 
@@ -3339,14 +3027,10 @@ async def test_middleware_headers_default():
     ignored otherwise, its headers should be translated into the
     customHttpRequestHeaders parameter."""
     settings = {
-        "DEFAULT_REQUEST_HEADERS": {
-            **DEFAULT_REQUEST_HEADERS,
-            "Accept-Encoding": DEFAULT_ACCEPT_ENCODING,
-            "User-Agent": DEFAULT_USER_AGENT,
-        },
+        "DEFAULT_REQUEST_HEADERS": MIDDLEWARE_DEFAULT_HEADERS,
         "ZYTE_API_TRANSPARENT_MODE": True,
     }
-    crawler = await get_crawler(settings)
+    crawler = await _get_cached_crawler(settings)
     request = Request(url="https://example.com")
     await _process_request(crawler, request)
 
@@ -3385,7 +3069,7 @@ async def test_middleware_headers_default_custom():
         "REFERER_ENABLED": False,  # https://github.com/scrapy/scrapy/issues/6184
         "ZYTE_API_TRANSPARENT_MODE": True,
     }
-    crawler = await get_crawler(settings)
+    crawler = await _get_cached_crawler(settings)
     request = Request(url="https://example.com")
     await _process_request(crawler, request)
 
@@ -3412,18 +3096,11 @@ async def test_middleware_headers_default_skip():
     """Headers set through DEFAULT_REQUEST_HEADERS will not be translated into
     the customHttpRequestHeaders parameter if configured to be skipped."""
     settings = {
-        "DEFAULT_REQUEST_HEADERS": {
-            **DEFAULT_REQUEST_HEADERS,
-            "Accept-Encoding": DEFAULT_ACCEPT_ENCODING,
-            "User-Agent": DEFAULT_USER_AGENT,
-        },
-        "ZYTE_API_SKIP_HEADERS": list(
-            set(header.decode() for header in SKIP_HEADERS)
-            | {*DEFAULT_REQUEST_HEADERS, "Accept-Encoding", "Referer", "User-Agent"}
-        ),
+        "DEFAULT_REQUEST_HEADERS": MIDDLEWARE_DEFAULT_HEADERS,
+        "ZYTE_API_SKIP_HEADERS": MIDDLEWARE_SKIP_HEADERS,
         "ZYTE_API_TRANSPARENT_MODE": True,
     }
-    crawler = await get_crawler(settings)
+    crawler = await _get_cached_crawler(settings)
     request = Request(url="https://example.com")
     await _process_request(crawler, request)
 
@@ -3440,14 +3117,10 @@ async def test_middleware_headers_request_headers():
     settings = {
         "ZYTE_API_TRANSPARENT_MODE": True,
     }
-    crawler = await get_crawler(settings)
+    crawler = await _get_cached_crawler(settings)
     request = Request(
         url="https://example.com",
-        headers={
-            **DEFAULT_REQUEST_HEADERS,
-            "Accept-Encoding": DEFAULT_ACCEPT_ENCODING,
-            "User-Agent": DEFAULT_USER_AGENT,
-        },
+        headers=MIDDLEWARE_DEFAULT_HEADERS,
     )
     await _process_request(crawler, request)
 
@@ -3472,7 +3145,7 @@ async def test_middleware_headers_request_headers():
 async def test_middleware_headers_request_headers_custom():
     """Non-default values set for headers with a default value also work as
     expected."""
-    crawler = await get_crawler({"ZYTE_API_TRANSPARENT_MODE": True})
+    crawler = await _get_cached_crawler({"ZYTE_API_TRANSPARENT_MODE": True})
     request = Request(
         url="https://example.com",
         headers={
@@ -3508,20 +3181,13 @@ async def test_middleware_headers_request_headers_skip():
     """Headers set on the request will not be translated into the
     customHttpRequestHeaders parameter if configured to be skipped."""
     settings = {
-        "ZYTE_API_SKIP_HEADERS": list(
-            set(header.decode() for header in SKIP_HEADERS)
-            | {*DEFAULT_REQUEST_HEADERS, "Accept-Encoding", "Referer", "User-Agent"}
-        ),
+        "ZYTE_API_SKIP_HEADERS": MIDDLEWARE_SKIP_HEADERS,
         "ZYTE_API_TRANSPARENT_MODE": True,
     }
-    crawler = await get_crawler(settings)
+    crawler = await _get_cached_crawler(settings)
     request = Request(
         url="https://example.com",
-        headers={
-            **DEFAULT_REQUEST_HEADERS,
-            "Accept-Encoding": DEFAULT_ACCEPT_ENCODING,
-            "User-Agent": DEFAULT_USER_AGENT,
-        },
+        headers=MIDDLEWARE_DEFAULT_HEADERS,
     )
     await _process_request(crawler, request)
 
@@ -3533,11 +3199,7 @@ async def test_middleware_headers_request_headers_skip():
 
 class DefaultValuesDownloaderMiddleware:
     def process_request(self, request, spider):
-        for k, v in {
-            **DEFAULT_REQUEST_HEADERS,
-            "Accept-Encoding": DEFAULT_ACCEPT_ENCODING,
-            "User-Agent": DEFAULT_USER_AGENT,
-        }.items():
+        for k, v in MIDDLEWARE_DEFAULT_HEADERS.items():
             request.headers[k] = v
 
 
@@ -3556,7 +3218,7 @@ async def test_middleware_headers_custom_middleware_before():
         **SETTINGS["DOWNLOADER_MIDDLEWARES"],
         mw1: SETTINGS["DOWNLOADER_MIDDLEWARES"][mw2] - 1,
     }
-    crawler = await get_crawler(settings)
+    crawler = await _get_cached_crawler(settings)
     request = Request("https://example.com")
     await _process_request(crawler, request)
 
@@ -3592,7 +3254,7 @@ async def test_middleware_headers_custom_middleware_before_custom():
         **SETTINGS["DOWNLOADER_MIDDLEWARES"],
         mw1: SETTINGS["DOWNLOADER_MIDDLEWARES"][mw2] - 1,
     }
-    crawler = await get_crawler(settings)
+    crawler = await _get_cached_crawler(settings)
     request = Request("https://example.com")
     await _process_request(crawler, request)
 
@@ -3621,10 +3283,7 @@ async def test_middleware_headers_custom_middleware_before_skip():
     customHttpRequestHeaders parameter if configured to be skipped."""
 
     settings = {
-        "ZYTE_API_SKIP_HEADERS": list(
-            set(header.decode() for header in SKIP_HEADERS)
-            | {*DEFAULT_REQUEST_HEADERS, "Accept-Encoding", "Referer", "User-Agent"}
-        ),
+        "ZYTE_API_SKIP_HEADERS": MIDDLEWARE_SKIP_HEADERS,
         "ZYTE_API_TRANSPARENT_MODE": True,
     }
     mw1 = "tests.test_api_requests.CustomValuesDownloaderMiddleware"
@@ -3633,7 +3292,7 @@ async def test_middleware_headers_custom_middleware_before_skip():
         **SETTINGS["DOWNLOADER_MIDDLEWARES"],
         mw1: SETTINGS["DOWNLOADER_MIDDLEWARES"][mw2] - 1,
     }
-    crawler = await get_crawler(settings)
+    crawler = await _get_cached_crawler(settings)
     request = Request("https://example.com")
     await _process_request(crawler, request)
 